@@ -1,6 +1,8 @@
 import os
 import importlib
 import chevron
+from chevron.tokenizer import tokenize
+from functools import lru_cache
 from datetime import datetime
 from time import time
 from cimpy.cgmes_v2_4_15.Base import Profile
@@ -9,115 +11,119 @@ import sys
 from cimpy.cgmes_v2_4_15.Base import Base
 cgmesProfile = Base.cgmesProfile
 from pathlib import Path
-import copy
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 
 logger = logging.getLogger(__name__)
 
+# Absolute path of the export template, independent of the current working directory
+_template_path = Path(__file__).resolve().parent / 'export_template.mustache'
+
+# Mapping between the export priority stored in the possibleProfileList and the short name of the profile
+_profile_value_to_name = {profile.value: profile.name for profile in Profile}
+
+# Default values of attributes, these are not exported
+_default_values = frozenset(('', None, 0.0, 0, 'list'))
+
 
 # This function gets all attributes of an object and resolves references to other objects
 def _get_class_attributes_with_references(import_result, version):
-    class_attributes_list = []
     # extract topology and urls
     topology = import_result['topology']
     urls = import_result['meta_info']['urls']
-    for key in topology.keys():
-        class_dict = dict(name=topology[key].__class__.__name__)
-        class_dict['mRID'] = key
-        # array containing all attributes, attribute references to objects
-        attributes_dict = _get_attributes(topology[key])
-        # change attribute references to mRID of the object, res needed because classes like SvPowerFlow does not have
-        # mRID as an attribute. Therefore the corresponding class has to be searched in the res dictionary
-        class_dict['attributes'] = _get_reference_uuid(attributes_dict, version, topology, key, urls)
-        class_attributes_list.append(class_dict)
-        del class_dict
+    base_class = importlib.import_module('cimpy.' + version + '.Base').Base
+    # reverse lookup from object identity to mRID, needed for classes without mRID as attribute like SvVoltage
+    mRID_index = {id(class_obj): mRID for mRID, class_obj in topology.items()}
+    # cache for _get_inherited_attributes, key: class of the object. Only kept for this export, so changes of the
+    # classes between exports are picked up
+    inherited_attributes_cache = {}
+    # _collect_class_entries returns all attributes and changes attribute references to mRID of the object,
+    # mRID_index needed because classes like SvPowerFlow does not have mRID as an attribute. Therefore the mRID of the
+    # corresponding class has to be looked up by identity
+    # serializationProfile and possibleProfileList are stored next to the attributes, the possibleProfileList is shared
+    # by all objects of the same class and must not be modified
+    class_attributes_list = []
+    for key, class_object in topology.items():
+        inherited_attributes, inherited_keys, possibleProfileList = _get_inherited_attributes(
+            type(class_object), inherited_attributes_cache)
+        class_attributes_list.append({
+            'name': class_object.__class__.__name__, 'mRID': key,
+            'serializationProfile': class_object.serializationProfile,
+            'possibleProfileList': possibleProfileList,
+            'attributes': _collect_class_entries(class_object, inherited_attributes, inherited_keys, base_class,
+                                                 mRID_index, key, urls)})
 
     return class_attributes_list
 
 
-# This function resolves references to objects
-def _get_reference_uuid(attr_dict, version, topology, mRID, urls):
+# This function extracts all attributes from class_object in the form of Class_Name.Attribute_Name and resolves
+# references to objects in the same pass. inherited_attributes and inherited_keys are the attributes inherited by the
+# class of class_object, see _get_inherited_attributes. The returned list contains one entry per exported attribute
+# value
+def _collect_class_entries(class_object, inherited_attributes, inherited_keys, base_class, mRID_index, mRID, urls):
     reference_list = []
-    base_class_name = 'cimpy.' + version + '.Base'
-    base_module = importlib.import_module(base_class_name)
-    base_class = getattr(base_module, 'Base')
-    for key in attr_dict:
-        if key in ['serializationProfile', 'possibleProfileList']:
-            reference_list.append({key: attr_dict[key]})
-            continue
-
-        attributes = {}
-        if isinstance(attr_dict[key], list):  # many
-            array = []
-            for elem in attr_dict[key]:
+    # bind append once, it is called for every exported attribute
+    reference_list_append = reference_list.append
+
+    # attributes not inherited from a parent class belong to the class of the object. The names are interned, all
+    # objects of a class share one string per attribute name in the exported entries
+    class_name = class_object.__class__.__name__
+    class_attributes = [(sys.intern(class_name + '.' + attr), attr) for attr in class_object.__dict__
+                        if attr not in inherited_keys]
+
+    for key, attr in chain(inherited_attributes, class_attributes):
+        value = getattr(class_object, attr)
+        if isinstance(value, list):  # many
+            for elem in value:
                 if issubclass(type(elem), base_class):
                     # classes like SvVoltage does not have an attribute called mRID, the mRID is only stored as a key
                     # for this object in the res dictionary
                     # The % added before the mRID is used in the lambda _set_attribute_or_reference
                     if not hasattr(elem, 'mRID'):
-                        # search for the object in the res dictionary and return the mRID
-                        UUID = '%' + _search_mRID(elem, topology)
+                        # look up the object by identity in the reverse index of the res dictionary
+                        UUID = '%' + mRID_index.get(id(elem), '')
                         if UUID == '%':
                             logger.warning('Object of type {} not found as reference for object with UUID {}.'.format(
                                 elem.__class__.__name__, mRID))
                     else:
                         UUID = '%' + elem.mRID
 
-                    array.append(UUID)
+                    reference_list_append({'value': UUID, 'attr_name': key})
                 else:
                     logger.warning('Reference object not subclass of Base class for object with UUID {}.'.format(mRID))
-            if len(array) == 1:
-                attributes['value'] = array[0]
-            else:
-                attributes['value'] = array
-        elif issubclass(type(attr_dict[key]), base_class):  # 0..1, 1..1
+        elif issubclass(type(value), base_class):  # 0..1, 1..1
             # resource = key + ' rdf:resource='
-            if not hasattr(attr_dict[key], 'mRID'):
-                # search for object in res dict and return mRID
+            if not hasattr(value, 'mRID'):
+                # look up object by identity in the reverse index of the res dict
                 # The % added before the mRID is used in the lambda _set_attribute_or_reference
-                UUID = '%' + _search_mRID(attr_dict[key], topology)
+                UUID = '%' + mRID_index.get(id(value), '')
                 if UUID == '%':
                     logger.warning('Object of type {} not found as reference for object with UUID {}.'.format(
-                        attr_dict[key].__class__.__name__, mRID))
+                        value.__class__.__name__, mRID))
             else:
-                UUID = '%' + attr_dict[key].mRID
-            attributes['value'] = UUID
-        elif attr_dict[key] == "" or attr_dict[key] is None:
+                UUID = '%' + value.mRID
+            reference_list_append({'value': UUID, 'attr_name': key})
+        elif value in _default_values:
+            # ignore default values
             pass
         else:
+            attribute_name = key.partition('.')[2]
             # attribute in urls dict?
-            if key.split('.')[1] in urls.keys():
+            attribute_urls = urls.get(attribute_name)
+            if attribute_urls is not None:
                 # value in urls dict? should always be true
-                if attr_dict[key] in urls[key.split('.')[1]].keys():
-                    attributes['value'] = '%URL%' + urls[key.split('.')[1]][attr_dict[key]]
+                if value in attribute_urls:
+                    reference_list_append({'value': '%URL%' + attribute_urls[value], 'attr_name': key})
                 else:
                     logger.warning('URL reference for attribute {} and value {} not found!'.format(
-                        key.split('.')[1], attr_dict[key]))
+                        attribute_name, value))
             else:
-                attributes['value'] = attr_dict[key]
-
-        attributes['attr_name'] = key
-        if 'value' in attributes.keys():
-            if isinstance(attributes['value'], list):
-                for reference_item in attributes['value']:
-                    # ignore default values
-                    if reference_item not in ['', None, 0.0, 0]:
-                        reference_list.append({'value': reference_item, 'attr_name': key})
-            # ignore default values
-            elif attributes['value'] not in ['', None, 0.0, 0, 'list']:
-                reference_list.append(attributes)
+                reference_list_append({'value': value, 'attr_name': key})
 
     return reference_list
 
 
-# This function searches a class_object in the res dictionary and returns the corresponding key (the mRID). Necessary
-# for classes without mRID as attribute like SvVoltage
-def _search_mRID(class_object, topology):
-    for mRID, class_obj in topology.items():
-        if class_object == class_obj:
-            return mRID
-    return ""
-
-
 # Lambda function for chevron renderer to decide whether the current element is a reference or an attribute
 def _set_attribute_or_reference(text, render):
     result = render(text)
@@ -149,13 +155,50 @@ def _set_attribute_or_reference_model(text, render):
 
 # Restructures the namespaces dict into a list. The template engine writes each entry in the RDF header
 def _create_namespaces_list(namespaces_dict):
-    namespaces_list = []
-
-    for key in namespaces_dict:
-        namespace = dict(key=key, url=namespaces_dict[key])
-        namespaces_list.append(namespace)
+    return [{'key': key, 'url': url} for key, url in namespaces_dict.items()]
+
+
+# This function determines the profile a class is exported to, see _sort_classes_to_profile. Returns None if the class
+# is skipped for export because none of its possible profiles is active
+def _get_class_serialization_profile(class_name, serializationProfile, possibleProfileList, active_profile_names):
+    class_serializationProfile = ''
+
+    if 'class' in serializationProfile:
+        # class was imported
+        if serializationProfile['class'] in active_profile_names:
+            # else: class origin profile not active for export, get active profile from possibleProfileList
+            if Profile[serializationProfile['class']].value in possibleProfileList[class_name]['class']:
+                # profile active and in possibleProfileList
+                # else: class should not have been imported from this profile, get allowed profile
+                # from possibleProfileList
+                class_serializationProfile = serializationProfile['class']
+            else:
+                logger.warning('Class {} was read from profile {} but this profile is not possible for this class'
+                               .format(class_name, serializationProfile['class']))
+        else:
+            logger.info('Class {} was read from profile {} but this profile is not active for the export. Use'
+                        'default profile from possibleProfileList.'.format(class_name, serializationProfile['class']))
+
+    if class_serializationProfile == '':
+        # class was created
+        if class_name in possibleProfileList:
+            if 'class' in possibleProfileList[class_name]:
+                for klass_profile in sorted(possibleProfileList[class_name]['class']):
+                    if _profile_value_to_name[klass_profile] in active_profile_names:
+                        # active profile for class export found
+                        class_serializationProfile = _profile_value_to_name[klass_profile]
+                        break
+                if class_serializationProfile == '':
+                    # no profile in possibleProfileList active
+                    logger.warning('All possible export profiles for class {} not active. Skip class for export.'
+                                   .format(class_name))
+                    return None
+            else:
+                logger.warning('Class {} has no profile to export to.'.format(class_name))
+        else:
+            logger.warning('Class {} has no profile to export to.'.format(class_name))
 
-    return namespaces_list
+    return class_serializationProfile
 
 
 # This function sorts the classes and their attributes to the corresponding profiles. Either the classes/attributes are
@@ -165,138 +208,105 @@ def _create_namespaces_list(namespaces_dict):
 # priority which is stored in the enum cgmesProfile. As default the smallest entry in the dictionary is used to
 # determine the profile for the class/attributes.
 def _sort_classes_to_profile(class_attributes_list, activeProfileList):
-    export_dict = {}
-    export_about_dict = {}
+    export_dict = defaultdict(lambda: {'classes': []})
+    export_about_dict = defaultdict(lambda: {'classes': []})
+    active_profile_names = frozenset(profile.name for profile in activeProfileList)
+    # export profile of the classes, key: (class name, profile the class was read from)
+    class_profile_cache = {}
 
     # iterate over classes
     for klass in class_attributes_list:
         same_package_list = []
-        about_dict = {}
+        about_dict = defaultdict(list)
 
         # store serializationProfile and possibleProfileList
         # serializationProfile class attribute, same for multiple instances of same class, only last origin of variable stored
-        serializationProfile = copy.deepcopy(klass['attributes'][0]['serializationProfile'])
-        possibleProfileList = copy.deepcopy(klass['attributes'][1]['possibleProfileList'])
-
-        class_serializationProfile = ''
-
-        if 'class' in serializationProfile.keys():
-            # class was imported
-            if Profile[serializationProfile['class']] in activeProfileList:
-                # else: class origin profile not active for export, get active profile from possibleProfileList
-                if Profile[serializationProfile['class']].value in possibleProfileList[klass['name']]['class']:
-                    # profile active and in possibleProfileList
-                    # else: class should not have been imported from this profile, get allowed profile
-                    # from possibleProfileList
-                    class_serializationProfile = serializationProfile['class']
-                else:
-                    logger.warning('Class {} was read from profile {} but this profile is not possible for this class'
-                                   .format(klass['name'], serializationProfile['class']))
-            else:
-                logger.info('Class {} was read from profile {} but this profile is not active for the export. Use'
-                            'default profile from possibleProfileList.'.format(klass['name'], serializationProfile['class']))
-
-        if class_serializationProfile == '':
-            # class was created
-            if klass['name'] in possibleProfileList.keys():
-                if 'class' in possibleProfileList[klass['name']].keys():
-                    possibleProfileList[klass['name']]['class'].sort()
-                    for klass_profile in possibleProfileList[klass['name']]['class']:
-                        if Profile(klass_profile).name in activeProfileList:
-                            # active profile for class export found
-                            class_serializationProfile = Profile(klass_profile).name
-                            break
-                    if class_serializationProfile == '':
-                        # no profile in possibleProfileList active
-                        logger.warning('All possible export profiles for class {} not active. Skip class for export.'
-                                       .format(klass['name']))
-                        continue
-                else:
-                    logger.warning('Class {} has no profile to export to.'.format(klass['name']))
-            else:
-                logger.warning('Class {} has no profile to export to.'.format(klass['name']))
+        # both are only read here, the profile lists are sorted into new lists
+        serializationProfile = klass['serializationProfile']
+        possibleProfileList = klass['possibleProfileList']
+
+        # the export profile of a class only depends on the class and the profile it was read from, the
+        # serializationProfile and possibleProfileList are shared by all objects of the class
+        class_profile_key = (klass['name'], serializationProfile.get('class', ''))
+        if class_profile_key in class_profile_cache:
+            class_serializationProfile = class_profile_cache[class_profile_key]
+        else:
+            class_serializationProfile = _get_class_serialization_profile(
+                klass['name'], serializationProfile, possibleProfileList, active_profile_names)
+            class_profile_cache[class_profile_key] = class_serializationProfile
+
+        if class_serializationProfile is None:
+            continue
 
         # iterate over attributes
         for attribute in klass['attributes']:
-            if 'attr_name' in attribute.keys():
-                attribute_class = attribute['attr_name'].split('.')[0]
-                attribute_name = attribute['attr_name'].split('.')[1]
-
-                # IdentifiedObject.mRID is not exported as an attribute
-                if attribute_name == 'mRID':
-                    continue
-
-                attribute_serializationProfile = ''
-
-                if attribute_name in serializationProfile.keys():
-                    # attribute was imported
-                    if Profile[serializationProfile[attribute_name]] in activeProfileList:
-                        attr_value = Profile[serializationProfile[attribute_name]].value
-                        if attr_value in possibleProfileList[attribute_class][attribute_name]:
-                            attribute_serializationProfile = serializationProfile[attribute_name]
-
-                if attribute_serializationProfile == '':
-                    # attribute was added
-                    if attribute_class in possibleProfileList.keys():
-                        if attribute_name in possibleProfileList[attribute_class].keys():
-                            possibleProfileList[attribute_class][attribute_name].sort()
-                            for attr_profile in possibleProfileList[attribute_class][attribute_name]:
-                                if Profile(attr_profile) in activeProfileList:
-                                    # active profile for class export found
-                                    attribute_serializationProfile = Profile(attr_profile).name
-                                    break
-                            if attribute_serializationProfile == '':
-                                # no profile in possibleProfileList active, skip attribute
-                                logger.warning('All possible export profiles for attribute {}.{} of class {} '
-                                               'not active. Skip attribute for export.'
-                                               .format(attribute_class, attribute_name, klass['name']))
-                                continue
-                        else:
-                            logger.warning('Attribute {}.{} of class {} has no profile to export to.'.
-                                           format(attribute_class, attribute_name, klass['name']))
-                    else:
-                        logger.warning('The class {} for attribute {} is not in the possibleProfileList'.format(
-                            attribute_class, attribute_name))
+            attribute_class, _, attribute_name = attribute['attr_name'].partition('.')
 
-                if attribute_serializationProfile == class_serializationProfile:
-                    # class and current attribute belong to same profile
-                    same_package_list.append(attribute)
-                else:
-                    # class and current attribute does not belong to same profile -> rdf:about in
-                    # attribute origin profile
-                    if attribute_serializationProfile in about_dict.keys():
-                        about_dict[attribute_serializationProfile].append(attribute)
+            # IdentifiedObject.mRID is not exported as an attribute
+            if attribute_name == 'mRID':
+                continue
+
+            attribute_serializationProfile = ''
+
+            # None if the attribute was not imported
+            imported_profile = serializationProfile.get(attribute_name)
+            if imported_profile in active_profile_names:
+                # attribute was imported from an active profile
+                attr_value = Profile[imported_profile].value
+                if attr_value in possibleProfileList[attribute_class][attribute_name]:
+                    attribute_serializationProfile = imported_profile
+
+            if attribute_serializationProfile == '':
+                # attribute was added
+                if attribute_class in possibleProfileList:
+                    if attribute_name in possibleProfileList[attribute_class]:
+                        for attr_profile in sorted(possibleProfileList[attribute_class][attribute_name]):
+                            if _profile_value_to_name[attr_profile] in active_profile_names:
+                                # active profile for class export found
+                                attribute_serializationProfile = _profile_value_to_name[attr_profile]
+                                break
+                        if attribute_serializationProfile == '':
+                            # no profile in possibleProfileList active, skip attribute
+                            logger.warning('All possible export profiles for attribute {}.{} of class {} '
+                                           'not active. Skip attribute for export.'
+                                           .format(attribute_class, attribute_name, klass['name']))
+                            continue
                     else:
-                        about_dict[attribute_serializationProfile] = [attribute]
+                        logger.warning('Attribute {}.{} of class {} has no profile to export to.'.
+                                       format(attribute_class, attribute_name, klass['name']))
+                else:
+                    logger.warning('The class {} for attribute {} is not in the possibleProfileList'.format(
+                        attribute_class, attribute_name))
+
+            if attribute_serializationProfile == class_serializationProfile:
+                # class and current attribute belong to same profile
+                same_package_list.append(attribute)
+            else:
+                # class and current attribute does not belong to same profile -> rdf:about in
+                # attribute origin profile
+                about_dict[attribute_serializationProfile].append(attribute)
 
         # add class with all attributes in the same profile to the export dict sorted by the profile
-        if class_serializationProfile in export_dict.keys():
-            export_class = dict(name=klass['name'], mRID=klass['mRID'], attributes=same_package_list)
-            export_dict[class_serializationProfile]['classes'].append(export_class)
-            del export_class
-        else:
-            export_class = dict(name=klass['name'], mRID=klass['mRID'], attributes=same_package_list)
-            export_dict[class_serializationProfile] = {'classes': [export_class]}
+        export_class = {'name': klass['name'], 'mRID': klass['mRID'], 'attributes': same_package_list}
+        export_dict[class_serializationProfile]['classes'].append(export_class)
 
         # add class with all attributes defined in another profile to the about_key sorted by the profile
-        for about_key in about_dict.keys():
-            if about_key in export_about_dict.keys():
-                export_about_class = dict(name=klass['name'], mRID=klass['mRID'], attributes=about_dict[about_key])
-                export_about_dict[about_key]['classes'].append(export_about_class)
-            else:
-                export_about_class = dict(name=klass['name'], mRID=klass['mRID'], attributes=about_dict[about_key])
-                export_about_dict[about_key] = {'classes': [export_about_class]}
+        for about_key, about_attributes in about_dict.items():
+            export_about_class = {'name': klass['name'], 'mRID': klass['mRID'], 'attributes': about_attributes}
+            export_about_dict[about_key]['classes'].append(export_about_class)
 
-    return export_dict, export_about_dict
+    # plain dicts, lookups of missing profiles must not add empty entries
+    return dict(export_dict), dict(export_about_dict)
 
 
-def cim_export(import_result, file_name, version, activeProfileList):
+def cim_export(import_result, file_name, version, activeProfileList, processes=1):
     """Function for serialization of cgmes classes
 
     This function serializes cgmes classes with the template engine chevron. The classes are separated by their profile
     and one xml file for each profile is created. The package name is added after the file name. The
     set_attributes_or_reference function is a lamda function for chevron to decide whether the value of an attribute is
-    a reference to another class object or not.
+    a reference to another class object or not. The profiles are independent of each other and can be rendered and
+    written in parallel processes.
 
     :param import_result: a dictionary containing the topology and meta information. The topology can be extracted via \
     :func:`~cimpy.cimimport.cim_import()`. The topology dictionary contains all objects accessible via their mRID. The meta \
@@ -309,6 +319,9 @@ def cim_export(import_result, file_name, version, activeProfileList):
     :param file_name: a string with the name of the xml files which will be created
     :param version: cgmes version, e.g. version = "cgmes_v2_4_15"
     :param activeProfileList: a list containing the strings of all short names of the profiles used for serialization
+    :param processes: number of processes used to render and write the profiles. With the default of 1 all profiles \
+    are written by the calling process. Scripts using more than one process on platforms which spawn new processes \
+    (Windows, macOS) have to guard the call with ``if __name__ == '__main__':``
     """
 
     t0 = time()
@@ -316,19 +329,19 @@ def cim_export(import_result, file_name, version, activeProfileList):
 
     profile_list = list(map(lambda a: Profile[a], activeProfileList))
 
-    # iterate over all profiles
+    # the classes are sorted to the profiles once for all exported profiles
+    export_dict, about_dict = _get_export_dicts(import_result, version, profile_list)
+
+    # collect file name and template data of all profiles
+    profile_tasks = []
     for profile in profile_list:
 
         # File name
         full_file_name = file_name + '_' + profile.long_name() + '.xml'
 
         if not os.path.exists(full_file_name):
-            output = generate_xml(import_result, version, file_name, profile, profile_list)
-
-            with open(full_file_name, 'w') as file:
-                logger.info('Write file \"%s\"', full_file_name)
-
-                file.write(output)
+            template_data = _get_template_data(import_result, file_name, profile, export_dict, about_dict)
+            profile_tasks.append((full_file_name, template_data))
         else:
             logger.error('File {} already exists. Delete file or change file name to serialize CGMES '
                            'classes.'.format(full_file_name))
@@ -336,6 +349,13 @@ def cim_export(import_result, file_name, version, activeProfileList):
                            'classes.'.format(full_file_name), file=sys.stderr)
             exit(-1)
 
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            list(executor.map(_write_profile, profile_tasks))
+    else:
+        for profile_task in profile_tasks:
+            _write_profile(profile_task)
+
     logger.info('End export procedure. Elapsed time: {}'.format(time() - t0))
 
 
@@ -351,6 +371,13 @@ def generate_xml(cim_data, version, model_name, profile, available_profiles):
     :param available_profiles: a list of all :class:`~cimpy.cgmes_v2_4_15.Base.Profile`s in `cim_data`
     """
 
+    export_dict, about_dict = _get_export_dicts(cim_data, version, available_profiles)
+    return chevron.render(_get_template_tokens(),
+                          _get_template_data(cim_data, model_name, profile, export_dict, about_dict))
+
+
+# This function returns the export dict and about dict containing the classes sorted to the available profiles
+def _get_export_dicts(cim_data, version, available_profiles):
     # returns all classes with their attributes and resolved references
     class_attributes_list = _get_class_attributes_with_references(
         cim_data, version)
@@ -358,22 +385,24 @@ def generate_xml(cim_data, version, model_name, profile, available_profiles):
     # determine class and attribute export profiles. The export dict contains all classes and their attributes where
     # the class definition and the attribute definitions are in the same profile. Every entry in about_dict generates
     # a rdf:about in another profile
-    export_dict, about_dict = _sort_classes_to_profile(
-        class_attributes_list, available_profiles)
+    return _sort_classes_to_profile(class_attributes_list, available_profiles)
+
 
+# This function collects the data for the export template of one profile
+def _get_template_data(cim_data, model_name, profile, export_dict, about_dict):
     namespaces_list = _create_namespaces_list(
         cim_data['meta_info']['namespaces'])
 
-    if profile.name not in export_dict.keys() and profile.name not in about_dict.keys():
+    if profile.name not in export_dict and profile.name not in about_dict:
         raise RuntimeError("Profile " + profile.name + " not available for export, export_dict=" + str(export_dict.keys()) + ' and about_dict='+ str(about_dict.keys()) + '.')
 
     # extract class lists from export_dict and about_dict
-    if profile.name in export_dict.keys():
+    if profile.name in export_dict:
         classes = export_dict[profile.name]['classes']
     else:
         classes = False
 
-    if profile.name in about_dict.keys():
+    if profile.name in about_dict:
         about = about_dict[profile.name]['classes']
     else:
         about = False
@@ -390,56 +419,108 @@ def generate_xml(cim_data, version, model_name, profile, available_profiles):
              'value': profile.long_name()}
         ]
     }
-    template_path = Path(os.path.join(os.path.dirname(__file__), 'export_template.mustache')).resolve()
-    with open(template_path) as f:
-        output = chevron.render(f, {"classes": classes,
-                                    "about": about,
-                                    "set_attributes_or_reference": _set_attribute_or_reference,
-                                    "set_attributes_or_reference_model": _set_attribute_or_reference_model,
-                                    "namespaces": namespaces_list,
-                                    "model": [model_description]})
-    del model_description
-    return output
-
-# This function extracts all attributes from class_object in the form of Class_Name.Attribute_Name
-def _get_attributes(class_object):
-    inheritance_list = [class_object]
-    class_type = type(class_object)
-    parent = class_object
-
-    # get parent classes
-    while 'Base.Base' not in str(class_type):
-        parent = parent.__class__.__bases__[0]()
-        # insert parent class at beginning of list, classes inherit from top to bottom
-        inheritance_list.insert(0, parent)
-        class_type = type(parent)
-
-    # dictionary containing all attributes with key: 'Class_Name.Attribute_Name'
-    attributes_dict = dict(serializationProfile=class_object.serializationProfile, possibleProfileList={})
-
+    return {"classes": classes,
+            "about": about,
+            "set_attributes_or_reference": _set_attribute_or_reference,
+            "set_attributes_or_reference_model": _set_attribute_or_reference_model,
+            "namespaces": namespaces_list,
+            "model": [model_description]}
+
+
+# This function writes one profile, the task is a tuple of the file name and the template data. Runs in a worker
+# process if the profiles are exported in parallel, therefore everything in the template data has to be picklable
+def _write_profile(profile_task):
+    full_file_name, template_data = profile_task
+    with open(full_file_name, 'w') as file:
+        logger.info('Write file \"%s\"', full_file_name)
+
+        _write_xml(file, template_data)
+
+
+# This function renders the export template into file. The classes and about sections are rendered and written
+# class by class, so the serialization of a profile is never held in memory as a whole
+def _write_xml(file, template_data):
+    for section, tokens in _get_template_parts():
+        if section is None:
+            file.write(chevron.render(tokens, template_data))
+        elif template_data[section]:
+            for klass in template_data[section]:
+                file.write(chevron.render(tokens, scopes=[klass, template_data]))
+
+
+# This function reads and tokenizes the export template. It is only done once, chevron renders from the cached tokens
+@lru_cache(maxsize=None)
+def _get_template_tokens():
+    with open(_template_path) as f:
+        return tuple(tokenize(f.read()))
+
+
+# This function splits the tokens of the export template at the classes and about sections. It returns a list of
+# (section, tokens) tuples, section is None for the parts outside of these sections and tokens are the tokens of one
+# iteration of the section otherwise
+@lru_cache(maxsize=None)
+def _get_template_parts():
+    template_parts = []
+    tokens = []
+    section = None
+    depth = 0
+    for tag_type, tag_key in _get_template_tokens():
+        if section is None and depth == 0 and tag_type == 'section' and tag_key in ('classes', 'about'):
+            template_parts.append((section, tuple(tokens)))
+            tokens = []
+            section = tag_key
+            continue
+        if section is not None and depth == 0 and (tag_type, tag_key) == ('end', section):
+            template_parts.append((section, tuple(tokens)))
+            tokens = []
+            section = None
+            continue
+        if tag_type in ('section', 'inverted section'):
+            depth += 1
+        elif tag_type == 'end':
+            depth -= 1
+        tokens.append((tag_type, tag_key))
+    template_parts.append((section, tuple(tokens)))
+    return template_parts
+
+
+# This function collects the attributes a class inherits from its parent classes in the form of
+# (Class_Name.Attribute_Name, Attribute_Name) together with the possibleProfileLists of the class and its parents.
+# The result only depends on the class, therefore the parent classes are instantiated once per class and export and
+# not once per object. The results are stored in inherited_attributes_cache.
+def _get_inherited_attributes(class_type, inherited_attributes_cache):
+    if class_type in inherited_attributes_cache:
+        return inherited_attributes_cache[class_type]
+
+    # get parent classes, classes inherit from top to bottom
+    inheritance_list = []
+    for parent_type in class_type.__mro__:
+        inheritance_list.insert(0, parent_type)
+        if 'Base.Base' in str(parent_type):
+            break
+
+    inherited_attributes = []
     # __dict__ of a subclass returns also the attributes of the parent classes
-    # to avoid multiple attributes create list with all attributes already processed
-    attributes_list = []
+    # to avoid multiple attributes create set with all attributes already processed
+    inherited_keys = set()
+    possibleProfileList = {}
 
     # iterate over parent classes from top to bottom
-    for parent_class in inheritance_list:
-        # get all attributes of the current parent class
-        parent_attributes_dict = parent_class.__dict__
-        class_name = parent_class.__class__.__name__
-
-        # check if new attribute or old attribute
-        for key in parent_attributes_dict.keys():
-            if key not in attributes_list:
-                attributes_list.append(key)
-                attributes_name = class_name + '.' + key
-                attributes_dict[attributes_name] = getattr(class_object, key)
-            else:
-                continue
+    for parent_type in inheritance_list:
+        class_name = parent_type.__name__
+        # the attributes of the class itself are read from the object, it may have additional ones
+        if parent_type is not class_type:
+            # get all attributes of the current parent class
+            for key in parent_type().__dict__:
+                if key not in inherited_keys:
+                    inherited_keys.add(key)
+                    inherited_attributes.append((sys.intern(class_name + '.' + key), key))
 
         # get all possibleProfileLists from all parent classes except the Base class (no attributes)
         # the serializationProfile from parent classes is not needed because entries in the serializationProfile
         # are only generated for the inherited class
         if class_name != 'Base':
-            attributes_dict['possibleProfileList'][class_name] = parent_class.possibleProfileList
+            possibleProfileList[class_name] = parent_type.possibleProfileList
 
-    return attributes_dict
+    inherited_attributes_cache[class_type] = (inherited_attributes, frozenset(inherited_keys), possibleProfileList)
+    return inherited_attributes_cache[class_type]
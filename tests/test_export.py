@@ -211,3 +211,42 @@ def test_export_with_imported_files(sample_cimdata, tmpdir):
 
                                 check.is_in(test_item, export_attr)
 
+
+def test_export_with_multiple_processes(sample_cimdata, tmpdir):
+    activeProfileList = ['DL', 'EQ', 'SV', 'TP']
+
+    cimpy.cim_export(sample_cimdata, tmpdir + '/EXPORTED_Sequential',
+                     'cgmes_v2_4_15', activeProfileList)
+    cimpy.cim_export(sample_cimdata, tmpdir + '/EXPORTED_Parallel',
+                     'cgmes_v2_4_15', activeProfileList, processes=2)
+
+    for long_name, short_name in short_profile_name.items():
+        if short_name not in activeProfileList:
+            continue
+        sequential_file = Path(tmpdir + '/EXPORTED_Sequential_' + long_name + '.xml')
+        parallel_file = Path(tmpdir + '/EXPORTED_Parallel_' + long_name + '.xml')
+        check.is_true(parallel_file.exists())
+        if parallel_file.exists():
+            sequential_export = xmltodict.parse(sequential_file.read_text(encoding='utf8'), attr_prefix="$",
+                                                cdata_key="_", dict_constructor=dict)['rdf:RDF']
+            parallel_export = xmltodict.parse(parallel_file.read_text(encoding='utf8'), attr_prefix="$",
+                                              cdata_key="_", dict_constructor=dict)['rdf:RDF']
+            sequential_classes = {key for key in sequential_export if 'cim:' in key}
+            parallel_classes = {key for key in parallel_export if 'cim:' in key}
+            check.equal(sequential_classes, parallel_classes)
+            for class_key in sequential_classes:
+                check.equal(sequential_export[class_key], parallel_export.get(class_key))
+
+
+def test_export_with_created_class(sample_cimdata, tmpdir):
+    activeProfileList = ['DL', 'EQ', 'SV', 'TP']
+
+    # the RegulatingControl is created after the import, it has no serializationProfile entry for the class
+    import_result = cimpy.utils.add_external_network_injection(sample_cimdata, 'cgmes_v2_4_15', 'N1', 20.0)
+    cimpy.cim_export(import_result, tmpdir + '/EXPORTED_Injection',
+                     'cgmes_v2_4_15', activeProfileList)
+
+    equipment_file = Path(tmpdir + '/EXPORTED_Injection_Equipment.xml')
+    equipment_export = xmltodict.parse(equipment_file.read_text(encoding='utf8'), attr_prefix="$",
+                                       cdata_key="_", dict_constructor=dict)['rdf:RDF']
+    check.is_in('cim:RegulatingControl', equipment_export.keys())